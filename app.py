@@ -1,9 +1,25 @@
 import os
+import sqlite3
 from pathlib import Path
 from typing import Dict, List
 from flask import Flask, render_template, request, redirect, url_for, flash
 
-from database import close_db, get_db, init_db, recalculate_month_totals
+from database import close_db, get_db, init_db, recalculate_month_totals, seed_demo_data
+
+# Tamanho de página das listagens — limita memória e render por requisição (Atualizar se necessário).
+PAGE_SIZE = 100
+
+# Só existem quatro formas de filtro na consulta; o SQL de cada uma é montado
+# uma vez aqui, então cada requisição reutiliza a mesma string e o statement
+# compilado que a conexão já tem em cache.
+ENTRIES_SELECT = "SELECT period, description, entry_type, amount, created_at FROM detail_entries"
+ENTRIES_ORDER = " ORDER BY period DESC, created_at DESC LIMIT ? OFFSET ?"
+ENTRIES_QUERIES = {
+    (False, False): ENTRIES_SELECT + ENTRIES_ORDER,
+    (True, False): ENTRIES_SELECT + " WHERE period = ?" + ENTRIES_ORDER,
+    (False, True): ENTRIES_SELECT + " WHERE entry_type = ?" + ENTRIES_ORDER,
+    (True, True): ENTRIES_SELECT + " WHERE period = ? AND entry_type = ?" + ENTRIES_ORDER,
+}
 
 
 def create_app(test_config: Dict | None = None) -> Flask:
@@ -26,23 +42,49 @@ def create_app(test_config: Dict | None = None) -> Flask:
     with app.app_context():
         init_db(app)
 
+    @app.cli.command('seed-demo')
+    def seed_demo():
+        """Popula o banco com lançamentos de demonstração."""
+        seed_demo_data(app)
+        print('Dados de demonstração inseridos.')
+
     register_routes(app)
     return app
 
 
 def register_routes(app: Flask) -> None:
+    # Cache por instância do app, invalidado por um contador de gerações que
+    # toda rota de escrita incrementa. updated_at tem resolução de segundo,
+    # então uma chave derivada do banco ficaria obsoleta para duas edições do
+    # mesmo mês dentro do mesmo segundo — o contador não depende do relógio.
+    dash_cache = {'generation': 0, 'key': None, 'totals': None, 'chart': None}
+
+    def invalidate_dashboard():
+        dash_cache['generation'] += 1
+
     @app.route('/')
     def dashboard():
-        db = get_db(app)
-        totals = db.execute(
-            "SELECT period, total_proventos, total_descontos, valor_liquido FROM monthly_totals ORDER BY period"
-        ).fetchall()
+        key = dash_cache['generation']
+        if key != dash_cache['key']:
+            # Só abre conexão quando realmente precisa recalcular; um cache hit nem toca o banco.
+            db = get_db(app)
+            totals = db.execute(
+                "SELECT period, total_proventos, total_descontos, valor_liquido FROM monthly_totals ORDER BY period"
+            ).fetchall()
+            dash_cache['totals'] = totals
+            # Série do gráfico montada aqui, numa passada só, em vez de loops no template.
+            dash_cache['chart'] = {
+                'labels': [row['period'] for row in totals],
+                'values': [row['valor_liquido'] for row in totals],
+            }
+            # A chave entra por último: outra thread nunca vê chave nova com dados velhos.
+            dash_cache['key'] = key
 
-        recent = db.execute(
-            "SELECT period, total_proventos, total_descontos, valor_liquido FROM monthly_totals ORDER BY period DESC LIMIT 1"
-        ).fetchone()
+        totals = dash_cache['totals']
+        # O mês mais recente é o último da lista já ordenada (Atualizar se necessário).
+        recent = totals[-1] if totals else None
 
-        return render_template('dashboard.html', totals=totals, recent=recent)
+        return render_template('dashboard.html', totals=totals, recent=recent, chart=dash_cache['chart'])
 
     @app.route('/details', methods=['GET', 'POST'])
     def details():
@@ -56,15 +98,87 @@ def register_routes(app: Flask) -> None:
                 "INSERT INTO detail_entries (period, description, entry_type, amount) VALUES (?, ?, ?, ?)",
                 (period, description, entry_type, amount),
             )
-            db.commit()
+            # Um único commit cobre o INSERT e o recálculo do total (Atualizar se necessário).
             recalculate_month_totals(app, period)
+            invalidate_dashboard()
             flash('Lançamento adicionado com sucesso!', 'success')
             return redirect(url_for('details'))
 
+        # O GET pós-redirect lê no máximo uma página, não a tabela inteira.
+        page = max(request.args.get('page', 1, type=int), 1)
         entries = db.execute(
-            "SELECT id, period, description, entry_type, amount, created_at FROM detail_entries ORDER BY period DESC, id DESC"
+            "SELECT id, period, description, entry_type, amount, created_at FROM detail_entries"
+            " ORDER BY period DESC, id DESC LIMIT ? OFFSET ?",
+            (PAGE_SIZE + 1, (page - 1) * PAGE_SIZE),
         ).fetchall()
-        return render_template('details.html', entries=entries)
+        has_next = len(entries) > PAGE_SIZE
+        entries = entries[:PAGE_SIZE]
+        return render_template('details.html', entries=entries, page=page, has_next=has_next)
+
+    @app.route('/details/bulk', methods=['POST'])
+    def bulk_details():
+        db = get_db(app)
+        operations = request.get_json(silent=True)
+        if not isinstance(operations, list):
+            return {'error': 'Envie uma lista JSON de operações.'}, 400
+
+        # Aplica tudo numa transação e recalcula cada período tocado uma única vez.
+        touched: Dict[str, None] = {}
+        try:
+            for operation in operations:
+                if not isinstance(operation, dict):
+                    raise ValueError('Cada operação deve ser um objeto JSON.')
+                action = operation.get('op')
+                if action == 'create':
+                    db.execute(
+                        "INSERT INTO detail_entries (period, description, entry_type, amount) VALUES (?, ?, ?, ?)",
+                        (
+                            operation['period'],
+                            operation['description'],
+                            operation['entry_type'],
+                            float(operation['amount']),
+                        ),
+                    )
+                    touched[operation['period']] = None
+                elif action == 'update':
+                    current = db.execute(
+                        "SELECT period FROM detail_entries WHERE id = ?",
+                        (operation['id'],),
+                    ).fetchone()
+                    if current is None:
+                        raise ValueError(f"Registro {operation['id']} não encontrado.")
+                    db.execute(
+                        "UPDATE detail_entries SET period = ?, description = ?, entry_type = ?, amount = ? WHERE id = ?",
+                        (
+                            operation['period'],
+                            operation['description'],
+                            operation['entry_type'],
+                            float(operation['amount']),
+                            operation['id'],
+                        ),
+                    )
+                    touched[current['period']] = None
+                    touched[operation['period']] = None
+                elif action == 'delete':
+                    current = db.execute(
+                        "SELECT period FROM detail_entries WHERE id = ?",
+                        (operation['id'],),
+                    ).fetchone()
+                    if current is None:
+                        raise ValueError(f"Registro {operation['id']} não encontrado.")
+                    db.execute("DELETE FROM detail_entries WHERE id = ?", (operation['id'],))
+                    touched[current['period']] = None
+                else:
+                    raise ValueError(f"Operação desconhecida: {action!r}.")
+        except (KeyError, TypeError, ValueError, sqlite3.IntegrityError) as exc:
+            db.rollback()
+            return {'error': str(exc)}, 400
+
+        for period in touched:
+            recalculate_month_totals(app, period, commit=False)
+        db.commit()
+        invalidate_dashboard()
+        return {'applied': len(operations), 'periods': list(touched)}
 
     @app.route('/details/<int:entry_id>/edit', methods=['GET', 'POST'])
     def edit_entry(entry_id):
@@ -87,10 +201,12 @@ def register_routes(app: Flask) -> None:
                 "UPDATE detail_entries SET period = ?, description = ?, entry_type = ?, amount = ? WHERE id = ?",
                 (period, description, entry_type, amount, entry_id),
             )
-            db.commit()
-            recalculate_month_totals(app, period)
+            # Um único commit cobre o UPDATE e os recálculos dos períodos tocados (Atualizar se necessário).
+            recalculate_month_totals(app, period, commit=False)
             if old_period != period:
-                recalculate_month_totals(app, old_period)
+                recalculate_month_totals(app, old_period, commit=False)
+            db.commit()
+            invalidate_dashboard()
             flash('Lançamento atualizado!', 'success')
             return redirect(url_for('details'))
 
@@ -105,8 +221,9 @@ def register_routes(app: Flask) -> None:
         ).fetchone()
         if entry:
             db.execute("DELETE FROM detail_entries WHERE id = ?", (entry_id,))
-            db.commit()
+            # Um único commit cobre o DELETE e o recálculo do total (Atualizar se necessário).
             recalculate_month_totals(app, entry['period'])
+            invalidate_dashboard()
             flash('Lançamento removido!', 'success')
         else:
             flash('Registro não encontrado.', 'danger')
@@ -117,25 +234,28 @@ def register_routes(app: Flask) -> None:
         db = get_db(app)
         period = request.args.get('period')
         entry_type = request.args.get('entry_type')
-        query = "SELECT period, description, entry_type, amount, created_at FROM detail_entries"
-        filters: List[str] = []
-        params: List[str] = []
-
-        if period:
-            filters.append('period = ?')
-            params.append(period)
-        if entry_type:
-            filters.append('entry_type = ?')
-            params.append(entry_type)
-        if filters:
-            query += " WHERE " + " AND ".join(filters)
-        query += " ORDER BY period DESC, created_at DESC"
+        query = ENTRIES_QUERIES[(bool(period), bool(entry_type))]
+        params: List[str | int] = [value for value in (period, entry_type) if value]
+
+        # Busca uma linha a mais só para saber se existe próxima página.
+        page = max(request.args.get('page', 1, type=int), 1)
+        params.extend([PAGE_SIZE + 1, (page - 1) * PAGE_SIZE])
 
         entries = db.execute(query, params).fetchall()
+        has_next = len(entries) > PAGE_SIZE
+        entries = entries[:PAGE_SIZE]
 
         totals_query = "SELECT period, total_proventos, total_descontos, valor_liquido FROM monthly_totals ORDER BY period DESC"
         totals = db.execute(totals_query).fetchall()
-        return render_template('queries.html', entries=entries, totals=totals)
+
+        # DISTINCT sai direto do índice composto (scan de índice, sem tocar a tabela).
+        periods = [row['period'] for row in db.execute(
+            "SELECT DISTINCT period FROM detail_entries ORDER BY period DESC"
+        ).fetchall()]
+
+        return render_template(
+            'queries.html', entries=entries, totals=totals, page=page, has_next=has_next, periods=periods
+        )
 
     @app.route('/totals')
     def totals():
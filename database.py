@@ -13,23 +13,51 @@ CREATE TABLE IF NOT EXISTS detail_entries (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- period é a chave natural; WITHOUT ROWID guarda a linha direto na B-tree da
+-- chave, sem o salto extra índice-único -> rowid (Atualizar se necessário).
 CREATE TABLE IF NOT EXISTS monthly_totals (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    period TEXT NOT NULL UNIQUE,
+    period TEXT PRIMARY KEY,
     total_proventos REAL NOT NULL DEFAULT 0,
     total_descontos REAL NOT NULL DEFAULT 0,
     valor_liquido REAL NOT NULL DEFAULT 0,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
+) WITHOUT ROWID;
+
+-- Índice composto cobrindo filtro, agrupamento e SUM sem tocar a tabela base (Atualizar se necessário).
+CREATE INDEX IF NOT EXISTS idx_detail_entries_period_type_amount
+    ON detail_entries (period, entry_type, amount);
+"""
+
+# SQL quente do recálculo num constante de módulo — sempre a mesma string,
+# então o cache de statements da conexão reaproveita o plano compilado.
+RECALC_TOTALS_SQL = """
+INSERT INTO monthly_totals (period, total_proventos, total_descontos, valor_liquido, updated_at)
+SELECT
+    ?,
+    COALESCE(SUM(CASE WHEN entry_type = 'provento' THEN amount ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN entry_type = 'desconto' THEN amount ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN entry_type = 'provento' THEN amount ELSE -amount END), 0),
+    CURRENT_TIMESTAMP
+FROM detail_entries
+WHERE period = ?
+ON CONFLICT(period) DO UPDATE SET
+    total_proventos=excluded.total_proventos,
+    total_descontos=excluded.total_descontos,
+    valor_liquido=excluded.valor_liquido,
+    updated_at=CURRENT_TIMESTAMP
 """
 
 
 def get_db(app):
     # Reutilize a mesma conexão por requisição (Atualizar se necessário).
     if 'db' not in g:
-        db_path = Path(app.config['DATABASE'])
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(app.config['DATABASE'], cached_statements=256)
+        # WAL deixa leituras e escrita conviverem e reduz fsyncs por commit (Atualizar se necessário).
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-20000")
         conn.row_factory = sqlite3.Row
         g.db = conn
     return g.db
@@ -38,48 +66,52 @@ def get_db(app):
 def close_db(_=None):
     db = g.pop('db', None)
     if db is not None:
+        try:
+            # Atualiza as estatísticas do planner a custo quase nulo (Atualizar se necessário).
+            db.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
         db.close()
 
 
 def init_db(app):
+    # O diretório do banco é garantido uma vez aqui, fora do caminho quente das requisições.
+    Path(app.config['DATABASE']).parent.mkdir(parents=True, exist_ok=True)
     db = get_db(app)
     db.executescript(DEFAULT_SCHEMA)
     db.commit()
+    # Sem estatísticas o planner pode ignorar o índice composto (Atualizar se necessário).
+    db.execute("ANALYZE")
+    # Trunca o WAL acumulado na inicialização para limitar seu crescimento (Atualizar se necessário).
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
 
-def recalculate_month_totals(app, period: str):
+def seed_demo_data(app):
+    # Insere tudo com um único executemany e um único commit — o fsync acontece uma vez por transação (Atualizar se necessário).
     db = get_db(app)
-    cur = db.execute(
-        """
-        SELECT
-            SUM(CASE WHEN entry_type = 'provento' THEN amount ELSE 0 END) AS total_proventos,
-            SUM(CASE WHEN entry_type = 'desconto' THEN amount ELSE 0 END) AS total_descontos
-        FROM detail_entries
-        WHERE period = ?
-        """,
-        (period,),
-    )
-    row = cur.fetchone()
-    total_proventos = row[0] or 0
-    total_descontos = row[1] or 0
-    valor_liquido = total_proventos - total_descontos
-
-    db.execute(
-        """
-        INSERT INTO monthly_totals (period, total_proventos, total_descontos, valor_liquido, updated_at)
-        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ON CONFLICT(period) DO UPDATE SET
-            total_proventos=excluded.total_proventos,
-            total_descontos=excluded.total_descontos,
-            valor_liquido=excluded.valor_liquido,
-            updated_at=CURRENT_TIMESTAMP
-        """,
-        (period, total_proventos, total_descontos, valor_liquido),
+    rows = [
+        ('2024-01', 'Salário base', 'provento', 5000.00),
+        ('2024-01', 'INSS', 'desconto', 550.00),
+        ('2024-02', 'Salário base', 'provento', 5000.00),
+        ('2024-02', 'Hora extra', 'provento', 320.00),
+        ('2024-02', 'INSS', 'desconto', 550.00),
+        ('2024-03', 'Salário base', 'provento', 5200.00),
+        ('2024-03', 'INSS', 'desconto', 572.00),
+    ]
+    db.executemany(
+        "INSERT INTO detail_entries (period, description, entry_type, amount) VALUES (?, ?, ?, ?)",
+        rows,
     )
+    for period in dict.fromkeys(row[0] for row in rows):
+        recalculate_month_totals(app, period, commit=False)
     db.commit()
-    return {
-        'period': period,
-        'total_proventos': total_proventos,
-        'total_descontos': total_descontos,
-        'valor_liquido': valor_liquido,
-    }
+
+
+def recalculate_month_totals(app, period: str, commit: bool = True):
+    # Recalcula apenas o período informado — nunca reescreva a tabela inteira (Atualizar se necessário).
+    # Com commit=False o chamador agrupa mutação e recálculo num único commit/fsync.
+    # Agregação e upsert acontecem num único statement SQL, sem materializar linhas em Python.
+    db = get_db(app)
+    db.execute(RECALC_TOTALS_SQL, (period, period))
+    if commit:
+        db.commit()
@@ -60,3 +60,49 @@ def test_add_and_delete_entry_updates_totals(client):
             ('2024-01',),
         ).fetchone()
         assert total_row['valor_liquido'] == 0
+
+
+def test_dashboard_reflects_rapid_successive_mutations(client):
+    payload = {
+        'period': '2024-02',
+        'description': 'Salário base',
+        'entry_type': 'provento',
+        'amount': '100.00',
+    }
+    client.post('/details', data=payload)
+    cached = client.get('/')
+    assert b'100.0' in cached.data
+
+    # Segunda mutação no mesmo mês, dentro do mesmo segundo de relógio:
+    # o dashboard não pode continuar servindo o total antigo do cache.
+    client.post('/details', data=dict(payload, description='Hora extra', amount='50.00'))
+    refreshed = client.get('/')
+    assert b'150.0' in refreshed.data
+
+
+def test_bulk_endpoint_applies_operations_and_reconciles(client):
+    operations = [
+        {'op': 'create', 'period': '2024-05', 'description': 'Salário', 'entry_type': 'provento', 'amount': 3000},
+        {'op': 'create', 'period': '2024-05', 'description': 'INSS', 'entry_type': 'desconto', 'amount': 300},
+        {'op': 'create', 'period': '2024-06', 'description': 'Salário', 'entry_type': 'provento', 'amount': 3100},
+    ]
+    response = client.post('/details/bulk', json=operations)
+    assert response.status_code == 200
+    assert response.get_json()['applied'] == 3
+
+    app = client.application
+    with app.app_context():
+        db = get_db(app)
+        rows = db.execute(
+            'SELECT period, valor_liquido FROM monthly_totals ORDER BY period'
+        ).fetchall()
+        assert [(row['period'], row['valor_liquido']) for row in rows] == [('2024-05', 2700.0), ('2024-06', 3100.0)]
+
+    invalid = client.post('/details/bulk', json=[{'op': 'explode'}])
+    assert invalid.status_code == 400
+
+    not_a_dict = client.post('/details/bulk', json=['not-a-dict'])
+    assert not_a_dict.status_code == 400
+
+    missing_field = client.post('/details/bulk', json=[{'op': 'create', 'period': '2024-07'}])
+    assert missing_field.status_code == 400